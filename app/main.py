@@ -7,6 +7,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from scipy import stats
 import numpy as np
+import os
 from datetime import datetime, timedelta
 from utils import (
     style_dataframe,
@@ -16,6 +17,26 @@ from utils import (
     create_time_series_plot,
     create_monthly_plot,
     create_cleaning_impact_plot,
+    create_cleaning_events_plot,
+    compute_cleaning_events,
+    compute_wind_rose_tables,
+    get_station_feeds,
+    station_feed_data,
+    watch_station_feeds,
+    get_reservoirs,
+    dataset_signature,
+    refine_in_background,
+    rerun_when_refined,
+    format_estimate,
+    estimate_mean,
+    estimate_quantile,
+    estimate_correlation,
+    filter_date_range,
+    hourly_pattern,
+    daily_means,
+    monthly_means,
+    daytime_averages,
+    create_wind_rose_plot,
     create_daytime_averages_plot,
     create_density_scatter,
     create_means_comparison,
@@ -48,8 +69,33 @@ data_paths = {
 # }
 
 
+# Live station feeds: (append-only file or drop directory, stored clean dataset)
+live_feeds = {
+    "Benin": ("data/live/benin", "data/benin_clean.csv"),
+    "Sierra Leone": ("data/live/sierraleone", "data/sierraleone_clean.csv"),
+    "Togo": ("data/live/togo", "data/togo_clean.csv")
+}
+
+live_mode = False
+if any(os.path.exists(source) for source, _ in live_feeds.values()):
+    live_mode = st.sidebar.checkbox("Live station feeds", value=True)
+    refresh_seconds = st.sidebar.number_input("Refresh every (s)", min_value=1, max_value=300, value=5)
+
 # Load all data at once
-dfs = load_all_data(data_paths)
+if live_mode:
+    feeds = get_station_feeds(live_feeds)
+    dfs = station_feed_data(feeds)
+    data_paths = {country: store for country, (_, store) in live_feeds.items() if country in dfs}
+else:
+    dfs = load_all_data(data_paths)
+
+# Approximate mode: answer from stratified samples first, while exact values are computed
+# in background threads and swapped in on a later rerun
+approx_mode = st.sidebar.checkbox("Approximate preview (sampled, 95% CI)", value=False)
+refinements = []  # (key, compute, render)
+signature = dataset_signature(dfs)
+if approx_mode:
+    reservoirs = get_reservoirs(dfs, feeds if live_mode else None)
 
 # --- Country-specific analysis ---
 if section == "Country Analysis":
@@ -67,23 +113,32 @@ if section == "Country Analysis":
     )
     
     # Filter data based on date range
-    mask = (df.index.date >= date_range[0]) & (df.index.date <= date_range[1])
-    df_filtered = df[mask]
+    df_filtered = filter_date_range(df, date_range[0], date_range[1])
+    # Live feeds keep hour-of-day statistics for their whole history
+    whole_history = live_mode and date_range[0] <= min_date.date() and date_range[1] >= max_date.date()
     
     analysis_type = st.sidebar.radio("Select Analysis Type", [
-        "Overview", "Time Series", "Cleaning Impact", "Correlation", "Advanced Analysis"])
+        "Overview", "Time Series", "Cleaning Impact", "Correlation", "Wind", "Advanced Analysis"])
 
     if analysis_type == "Overview":
         st.title(f"🌞 Solar Overview — {country}")
         
         # Key metrics in columns
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Avg GHI (W/m²)", f"{df_filtered['GHI'].mean():.2f}")
-        with col2:
-            st.metric("Avg DNI (W/m²)", f"{df_filtered['DNI'].mean():.2f}")
-        with col3:
-            st.metric("Avg DHI (W/m²)", f"{df_filtered['DHI'].mean():.2f}")
+        for column, metric in zip(st.columns(3), ["GHI", "DNI", "DHI"]):
+            placeholder = column.empty()
+            if approx_mode:
+                sample = reservoirs[country].sample(start=str(date_range[0]), end=str(date_range[1]))
+                placeholder.metric(f"Avg {metric} (W/m²) ≈", format_estimate(*estimate_mean(sample, metric)))
+                refinements.append((
+                    ('overview', country, str(date_range), metric),
+                    lambda d=df_filtered, m=metric: d[m].mean(),
+                    lambda value, p=placeholder, m=metric: p.metric(f"Avg {m} (W/m²)", f"{value:.2f}")))
+            elif live_mode:
+                # From the feed's daily sums and counts, so no rescan of the raw rows
+                mean = feeds[country].range_means(date_range[0], date_range[1])[metric]
+                placeholder.metric(f"Avg {metric} (W/m²)", f"{mean:.2f}")
+            else:
+                placeholder.metric(f"Avg {metric} (W/m²)", f"{df_filtered[metric].mean():.2f}")
 
         # Interactive time series plots
         st.subheader("Interactive Time Series")
@@ -114,8 +169,10 @@ if section == "Country Analysis":
         st.subheader("Daily Patterns")
         selected_metric = st.selectbox("Select metric for daily pattern", metrics)
         
-        df_filtered['Hour'] = df_filtered.index.hour
-        daily_pattern = df_filtered.groupby('Hour')[selected_metric].agg(['mean', 'std']).reset_index()
+        if whole_history:
+            daily_pattern = feeds[country].hourly_stats(selected_metric).reset_index()
+        else:
+            daily_pattern = hourly_pattern(df_filtered, selected_metric).reset_index()
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
@@ -205,6 +262,21 @@ if section == "Country Analysis":
                 }).round(2)
                 
                 st.dataframe(style_dataframe(summary_df))
+                
+                # Per-event analysis: fixed windows before and after each cleaning event
+                st.subheader("Per-Event Soiling Recovery")
+                window_minutes = st.slider("Window length (minutes)", 10, 240, 60, step=10)
+                normalize = st.checkbox("Normalize by GHI", value=True)
+                events, event_summary = compute_cleaning_events(
+                    (signature, country, str(date_range)), df_filtered,
+                    f"{window_minutes}min", "GHI" if normalize else None)
+                
+                if events['valid'].any():
+                    fig = create_cleaning_events_plot(events)
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.dataframe(style_dataframe(event_summary.round(2)))
+                else:
+                    st.warning("No cleaning events with complete before/after windows in the selected range.")
             else:
                 st.warning("No cleaning events found in the selected date range.")
         else:
@@ -217,8 +289,20 @@ if section == "Country Analysis":
         corr_columns = ["GHI", "DNI", "DHI", "TModA", "TModB"]
         
         # Create and display correlation matrix
-        fig = create_correlation_matrix(df_filtered, corr_columns)
-        st.plotly_chart(fig, use_container_width=True)
+        matrix_placeholder = st.empty()
+        if approx_mode:
+            sample = reservoirs[country].sample(start=str(date_range[0]), end=str(date_range[1]))
+            corr, low, high = estimate_correlation(sample, corr_columns)
+            text = corr.round(3).astype(str) + "<br>[" + low.round(2).astype(str) + ", " + high.round(2).astype(str) + "]"
+            matrix_placeholder.plotly_chart(create_correlation_matrix(None, corr_columns, corr, text),
+                                            use_container_width=True)
+            refinements.append((
+                ('correlation', country, str(date_range)),
+                lambda d=df_filtered: create_correlation_matrix(d, corr_columns),
+                lambda fig: matrix_placeholder.plotly_chart(fig, use_container_width=True)))
+        else:
+            fig = create_correlation_matrix(df_filtered, corr_columns)
+            matrix_placeholder.plotly_chart(fig, use_container_width=True)
         
         # Pairwise correlation analysis
         st.subheader("Pairwise Correlation Analysis")
@@ -227,13 +311,56 @@ if section == "Country Analysis":
                            index=1 if col_x != corr_columns[1] else 0)
         
         # Create KDE plot
-        fig = create_kde_plot(df_filtered, col_x, col_y)
-        st.plotly_chart(fig, use_container_width=True)
+        kde_placeholder = st.empty()
+        if approx_mode:
+            fig = create_kde_plot(sample, col_x, col_y, weights=sample['weight'])
+            refinements.append((
+                ('kde', country, str(date_range), col_x, col_y),
+                lambda d=df_filtered, x=col_x, y=col_y: create_kde_plot(d, x, y),
+                lambda fig: kde_placeholder.plotly_chart(fig, use_container_width=True)))
+        else:
+            fig = create_kde_plot(df_filtered, col_x, col_y)
+        kde_placeholder.plotly_chart(fig, use_container_width=True)
         
         # Display summary statistics
         st.subheader("Summary Statistics")
-        stats_df = df_filtered[[col_x, col_y]].agg(['mean', 'std', 'min', 'max']).round(2)
-        st.dataframe(style_dataframe(stats_df))
+        stats_placeholder = st.empty()
+        if approx_mode:
+            approx_stats = {}
+            for col in [col_x, col_y]:
+                mean, half_width = estimate_mean(sample, col)
+                median, low, high = estimate_quantile(sample, col, 0.5)
+                approx_stats[col] = {
+                    'Mean': mean, 'Mean ± (95%)': half_width,
+                    'Median': median, 'Median low': low, 'Median high': high
+                }
+            stats_placeholder.dataframe(style_dataframe(pd.DataFrame(approx_stats)))
+            refinements.append((
+                ('stats', country, str(date_range), col_x, col_y),
+                lambda d=df_filtered[[col_x, col_y]]: d.agg(['mean', 'std', 'min', 'max']).round(2),
+                lambda stats_df: stats_placeholder.dataframe(style_dataframe(stats_df))))
+        else:
+            stats_df = df_filtered[[col_x, col_y]].agg(['mean', 'std', 'min', 'max']).round(2)
+            stats_placeholder.dataframe(style_dataframe(stats_df))
+
+    elif analysis_type == "Wind":
+        st.title(f"🌬️ Wind Analysis — {country}")
+        if {'WD', 'WS'}.issubset(df_filtered.columns):
+            by_month = st.checkbox("Show one wind rose per month")
+            tables = compute_wind_rose_tables(df_filtered[['WD', 'WS']], by_month)
+            
+            if by_month:
+                month = st.select_slider(
+                    "Month",
+                    options=list(tables.keys()),
+                    format_func=lambda m: datetime(2000, m, 1).strftime('%B')
+                )
+                fig = create_wind_rose_plot(tables[month], f"Wind Rose — {datetime(2000, month, 1):%B}")
+            else:
+                fig = create_wind_rose_plot(tables['All'])
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("Wind direction/speed not available in dataset.")
 
     elif analysis_type == "Advanced Analysis":
         st.title(f"🔬 Advanced Analysis — {country}")
@@ -244,9 +371,11 @@ if section == "Country Analysis":
         
         # Time-based patterns
         st.subheader("Time-based Patterns")
-        df_filtered['Hour'] = df_filtered.index.hour
-        df_filtered['Day'] = df_filtered.index.day_name()
-        df_filtered['Month'] = df_filtered.index.month_name()
+        df_filtered = df_filtered.assign(
+            Hour=df_filtered.index.hour,
+            Day=df_filtered.index.day_name(),
+            Month=df_filtered.index.month_name(),
+        )
         
         time_pattern = st.selectbox(
             "Select time pattern",
@@ -293,7 +422,7 @@ elif section == "Cross-Country Comparison":
     
     # Filter data based on date range
     dfs_filtered = {
-        country: df[(df.index.date >= date_range[0]) & (df.index.date <= date_range[1])]
+        country: filter_date_range(df, date_range[0], date_range[1])
         for country, df in dfs.items()
     }
     
@@ -336,20 +465,33 @@ elif section == "Cross-Country Comparison":
         st.subheader("Time Series Comparison")
         
         # Resample data to daily for better performance
-        daily_data = {
-            country: df[metric].resample('D').mean()
-            for country, df in dfs_filtered.items()
-        }
+        if live_mode:
+            # Incrementally maintained by the feeds, so no rescan of the raw rows
+            daily_data = {
+                country: feed.daily_means(date_range[0], date_range[1])[metric]
+                for country, feed in feeds.items() if country in dfs
+            }
+        else:
+            daily_data = {
+                country: daily_means(df, metric)
+                for country, df in dfs_filtered.items()
+            }
         
         # Create and display daily time series plot
         fig = create_time_series_plot(daily_data, metric)
         st.plotly_chart(fig, use_container_width=True)
         
         # Monthly averages for trend analysis
-        monthly_data = {
-            country: df[metric].resample('M').mean()
-            for country, df in dfs_filtered.items()
-        }
+        if live_mode:
+            monthly_data = {
+                country: feed.monthly_means(date_range[0], date_range[1])[metric]
+                for country, feed in feeds.items() if country in dfs
+            }
+        else:
+            monthly_data = {
+                country: monthly_means(df, metric)
+                for country, df in dfs_filtered.items()
+            }
         
         # Create and display monthly plot
         fig = create_monthly_plot(monthly_data, metric)
@@ -358,20 +500,52 @@ elif section == "Cross-Country Comparison":
     with tab3:
         st.subheader("Daytime Averages (6:00 - 18:00)")
         
-        # Calculate daytime averages
-        daytime_avg = {}
-        for country, df in dfs_filtered.items():
-            daytime_mask = (df['hour'] >= 6) & (df['hour'] <= 18)
-            daytime_avg[country] = df[daytime_mask][metric].mean()
+        def exact_daytime_averages():
+            return daytime_averages(dfs_filtered, metric), None
         
-        # Create and display daytime averages plot
-        fig = create_daytime_averages_plot(daytime_avg, metric)
-        st.plotly_chart(fig, use_container_width=True)
+        def approx_daytime_averages():
+            daytime_avg, half_widths = {}, {}
+            for country in dfs_filtered:
+                sample = reservoirs[country].sample(start=str(date_range[0]), end=str(date_range[1]))
+                sample = sample[(sample.index.hour >= 6) & (sample.index.hour <= 18)]
+                daytime_avg[country], half_widths[country] = estimate_mean(sample, metric)
+            return daytime_avg, half_widths
         
-        # Display the values in a table
-        daytime_df = pd.DataFrame({
-            'Country': list(daytime_avg.keys()),
-            f'Average {metric}': list(daytime_avg.values())
-        }).round(2)
+        def show_daytime_averages(daytime_avg, half_widths):
+            # Create and display daytime averages plot
+            chart_placeholder.plotly_chart(create_daytime_averages_plot(daytime_avg, metric), use_container_width=True)
+            
+            # Display the values in a table
+            daytime_df = pd.DataFrame({
+                'Country': list(daytime_avg.keys()),
+                f'Average {metric}': list(daytime_avg.values())
+            })
+            if half_widths is not None:
+                daytime_df['± (95% CI)'] = list(half_widths.values())
+            table_placeholder.dataframe(style_dataframe(daytime_df.round(2)))
         
-        st.dataframe(style_dataframe(daytime_df))
\ No newline at end of file
+        chart_placeholder, table_placeholder = st.empty(), st.empty()
+        if approx_mode:
+            show_daytime_averages(*approx_daytime_averages())
+            refinements.append((
+                ('daytime', str(date_range), metric),
+                exact_daytime_averages,
+                lambda result: show_daytime_averages(*result)))
+        else:
+            show_daytime_averages(*exact_daytime_averages())
+
+# Swap in exact results that have finished; poll for the rest without blocking the page
+if approx_mode and st.sidebar.checkbox("Refine to exact results", value=True):
+    pending = []
+    for key, compute, render in refinements:
+        future = refine_in_background(signature, key, compute)
+        if future.done():
+            render(future.result())
+        else:
+            pending.append(future)
+    if pending:
+        rerun_when_refined(pending)
+
+# Pick up newly appended station data
+if live_mode:
+    watch_station_feeds(feeds, refresh_seconds)
@@ -5,8 +5,18 @@ from scipy import stats
 import numpy as np
 import streamlit as st
 import requests
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.analysis.cleaning_events import compute_cleaning_uplift, summarize_cleaning_uplift
+from src.analysis.wind_rose import wind_rose_table, wind_rose_tables_by, to_frequency
+from src.preprocessing.ingestion import StationFeed, AGGREGATE_COLUMNS
+from src.analysis.aggregations import filter_date_range, hourly_pattern, daily_means, monthly_means, daytime_averages
+from src.analysis.sampling import StratifiedReservoir, estimate_mean, estimate_quantile, estimate_correlation
+
 def style_dataframe(df):
     """Apply consistent styling to all dataframes"""
     return df.style.background_gradient(cmap='RdYlBu_r')\
@@ -62,6 +72,8 @@ def load_all_data(data_paths):
                 if 'Comments' in df.columns:
                     df = df.drop('Comments', axis=1)
                 df.set_index('Timestamp', inplace=True)
+                # filter_date_range slices the index by label, which needs it sorted
+                df.sort_index(inplace=True)
                 df['hour'] = df.index.hour
                 dfs[country] = df
             else:
@@ -71,9 +83,44 @@ def load_all_data(data_paths):
     
     return dfs
 
-def create_correlation_matrix(df, columns):
-    """Create correlation matrix heatmap"""
-    corr = df[columns].corr()
+@st.cache_resource
+def get_station_feeds(live_feeds):
+    """Open one append-only feed per country, shared across reruns and sessions"""
+    return {
+        country: StationFeed(source, store)
+        for country, (source, store) in live_feeds.items()
+    }
+
+def station_feed_data(feeds):
+    """Current data of every feed that has any rows yet"""
+    dfs = {}
+    for country, feed in feeds.items():
+        if feed.data is not None:
+            dfs[country] = feed.data
+    return dfs
+
+def poll_station_feeds(feeds):
+    """Ingest rows appended since the last poll and return how many arrived"""
+    added = 0
+    for country, feed in feeds.items():
+        try:
+            added += feed.poll()
+        except Exception as e:
+            st.error(f"Error ingesting live data for {country}: {e}")
+    return added
+
+def watch_station_feeds(feeds, refresh_seconds):
+    """Poll feeds every few seconds without blocking the page; rerun it only when rows arrive"""
+    @st.fragment(run_every=refresh_seconds)
+    def watch():
+        if poll_station_feeds(feeds):
+            st.rerun()
+    watch()
+
+def create_correlation_matrix(df, columns, corr=None, text=None):
+    """Create correlation matrix heatmap (optionally from a precomputed matrix and cell text)"""
+    if corr is None:
+        corr = df[columns].corr()
     fig = go.Figure(data=go.Heatmap(
         z=corr,
         x=corr.columns,
@@ -81,7 +128,7 @@ def create_correlation_matrix(df, columns):
         colorscale='RdBu',
         zmin=-1,
         zmax=1,
-        text=corr.round(3),
+        text=corr.round(3) if text is None else text,
         texttemplate='%{text}',
         textfont={"size": 12},
         hoverongaps=False
@@ -207,6 +254,68 @@ def create_cleaning_impact_plot(before_cleaning, after_cleaning):
     )
     return fig
 
+@st.cache_data(ttl=3600)
+def compute_cleaning_events(signature, _df, window, normalize_by=None):
+    """Compute per-event cleaning uplift and its aggregate summary
+
+    Cached on ``signature`` (what the rows are, e.g. country, date range and
+    dataset signature) rather than by hashing the whole frame on every rerun.
+    """
+    events = compute_cleaning_uplift(_df, ('ModA', 'ModB'), window=window, normalize_by=normalize_by)
+    return events, summarize_cleaning_uplift(events, ('ModA', 'ModB'))
+
+def create_cleaning_events_plot(events):
+    """Create per-event cleaning uplift plot"""
+    events = events[events['valid']]
+    fig = go.Figure()
+    for sensor in ['ModA', 'ModB']:
+        fig.add_trace(go.Scatter(
+            x=events['event_start'],
+            y=events[f'{sensor}_uplift_pct'],
+            name=sensor,
+            mode='markers+lines'
+        ))
+    fig.add_hline(y=0, line_color='grey')
+    
+    fig.update_layout(
+        title="Uplift per Cleaning Event",
+        xaxis_title="Cleaning Event",
+        yaxis_title="Uplift (%)",
+        hovermode='x unified'
+    )
+    return fig
+
+@st.cache_data(ttl=3600)
+def compute_wind_rose_tables(df, by_month=False):
+    """Compute the pre-binned wind rose table, overall or per month"""
+    if by_month:
+        return wind_rose_tables_by(df, df.index.month)
+    return {'All': wind_rose_table(df)}
+
+def create_wind_rose_plot(table, title="Wind Rose"):
+    """Create wind rose from a pre-binned direction x speed table"""
+    freq = to_frequency(table)
+    fig = go.Figure()
+    for speed in freq.columns:
+        fig.add_trace(go.Barpolar(
+            r=freq[speed],
+            theta=freq.index,
+            name=f"{speed} m/s",
+            marker_line_color='white',
+            marker_line_width=1
+        ))
+    
+    fig.update_layout(
+        title=title,
+        polar=dict(
+            angularaxis=dict(direction='clockwise', rotation=90),
+            radialaxis=dict(ticksuffix='%')
+        ),
+        legend_title="Wind Speed",
+        height=600
+    )
+    return fig
+
 def create_daytime_averages_plot(daytime_avg, metric):
     """Create daytime averages bar plot"""
     fig = go.Figure()
@@ -247,22 +356,25 @@ def create_means_comparison(df, x_col, y_col):
     )
     return fig
 
-def create_density_scatter(df, x_col, y_col):
-    """Create an efficient density scatter plot using hexbinning"""
-    # Sample data if it's too large (keep 10% of points)
-    if len(df) > 10000:
-        df = df.sample(n=10000, random_state=42)
+def _histogram2d(df, x_col, y_col, bins, weights=None):
+    """Bin two columns server-side so the browser receives a grid, not every point"""
+    data = df[[x_col, y_col]].dropna()
+    w = None if weights is None else weights.loc[data.index].to_numpy()
+    counts, x_edges, y_edges = np.histogram2d(data[x_col], data[y_col], bins=bins, weights=w)
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+    return counts.T, x_centers, y_centers
+
+def create_density_scatter(df, x_col, y_col, weights=None):
+    """Create an efficient density plot from a server-side 2D histogram of all (or weighted sampled) rows"""
+    counts, x_centers, y_centers = _histogram2d(df, x_col, y_col, 50, weights)
     
-    # Create hexbin plot
     fig = go.Figure()
-    
-    # Add hexbin trace
-    fig.add_trace(go.Histogram2d(
-        x=df[x_col],
-        y=df[y_col],
+    fig.add_trace(go.Heatmap(
+        z=np.where(counts > 0, counts, np.nan),
+        x=x_centers,
+        y=y_centers,
         colorscale='Viridis',
-        nbinsx=50,
-        nbinsy=50,
         showscale=True,
         colorbar=dict(title='Count')
     ))
@@ -275,28 +387,22 @@ def create_density_scatter(df, x_col, y_col):
     )
     return fig
 
-def create_kde_plot(df, x_col, y_col):
-    """Create a 2D KDE plot showing the density distribution of points"""
-    # Sample data if it's too large (keep 5% of points)
-    if len(df) > 5000:
-        df = df.sample(n=5000, random_state=42)
+def create_kde_plot(df, x_col, y_col, weights=None):
+    """Create a 2D density contour plot from all (or weighted sampled) rows"""
+    counts, x_centers, y_centers = _histogram2d(df, x_col, y_col, 30, weights)
     
-    # Create KDE plot
     fig = go.Figure()
-    
-    # Add KDE trace
-    fig.add_trace(go.Histogram2dContour(
-        x=df[x_col],
-        y=df[y_col],
+    fig.add_trace(go.Contour(
+        z=counts,
+        x=x_centers,
+        y=y_centers,
         colorscale='Viridis',
-        nbinsx=30,
-        nbinsy=30,
         showscale=True,
         colorbar=dict(title='Density')
     ))
     
     # Add a few actual points for reference
-    sample_points = df.sample(n=100, random_state=42)
+    sample_points = df.sample(n=min(100, len(df)), random_state=42)
     fig.add_trace(go.Scatter(
         x=sample_points[x_col],
         y=sample_points[y_col],
@@ -315,4 +421,51 @@ def create_kde_plot(df, x_col, y_col):
         yaxis_title=y_col,
         height=500
     )
-    return fig 
\ No newline at end of file
+    return fig
+
+@st.cache_resource
+def build_reservoirs(signature, _dfs):
+    """Build stratified (station, month, hour) samples once per loaded dataset"""
+    return {
+        country: StratifiedReservoir(AGGREGATE_COLUMNS, seed=42).update(df, country)
+        for country, df in _dfs.items()
+    }
+
+def dataset_signature(dfs):
+    """Cheap fingerprint of the loaded data that changes whenever rows are added"""
+    return tuple((country, len(df), df.index.max()) for country, df in dfs.items())
+
+def get_reservoirs(dfs, feeds=None):
+    """Stratified samples per country; live feeds refresh theirs on every ingest"""
+    if feeds is not None:
+        return {country: feed.reservoir() for country, feed in feeds.items() if country in dfs}
+    return build_reservoirs(dataset_signature(dfs), dfs)
+
+@st.cache_resource
+def get_refinement_executor():
+    """Worker threads computing exact results behind approximate previews, shared across sessions"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix='refine')
+
+def refine_in_background(signature, key, compute):
+    """Start ``compute`` off the script thread once per key and dataset signature and return its future"""
+    jobs = st.session_state.setdefault('refinement_jobs', {})
+    # Jobs for data that has since changed (e.g. a live feed ingested rows) are never shown;
+    # cancel them so they do not hold up the shared workers
+    for stale in [k for k in jobs if k[0] != signature]:
+        jobs.pop(stale).cancel()
+    if (signature, key) not in jobs:
+        jobs[(signature, key)] = get_refinement_executor().submit(compute)
+        # Only keep results for the most recent views
+        while len(jobs) > 16:
+            jobs.pop(next(iter(jobs))).cancel()
+    return jobs[(signature, key)]
+
+@st.fragment(run_every=1)
+def rerun_when_refined(futures):
+    """Poll pending exact results without blocking the page, then rerun to show them"""
+    if all(future.done() for future in futures):
+        st.rerun()
+
+def format_estimate(value, half_width):
+    """Format an approximate value with its 95% confidence half-width"""
+    return f"{value:.2f} ± {half_width:.2f}"
@@ -0,0 +1,55 @@
+"""Render the per-country EDA figures to a static PNG/HTML report.
+
+Figures are drawn on the Agg backend, one country per worker process, and a
+country is only re-rendered when its input CSV changes.
+
+Usage:
+    python scripts/generate_eda_report.py
+    python scripts/generate_eda_report.py --data Benin=data/benin_clean.csv --output reports --force
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.visualization.report import generate_report
+
+DEFAULT_DATA_PATHS = {
+    "Benin": "data/benin_clean.csv",
+    "Sierra Leone": "data/sierraleone_clean.csv",
+    "Togo": "data/togo_clean.csv"
+}
+
+
+def parse_data_paths(values):
+    data_paths = {}
+    for value in values:
+        country, sep, path = value.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected COUNTRY=PATH, got {value!r}")
+        data_paths[country] = path
+    return data_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', nargs='+', metavar='COUNTRY=PATH',
+                        help='cleaned CSV per country (defaults to data/<country>_clean.csv)')
+    parser.add_argument('--output', default='reports', help='output directory')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--force', action='store_true', help='ignore cached figures')
+    args = parser.parse_args()
+
+    data_paths = parse_data_paths(args.data) if args.data else DEFAULT_DATA_PATHS
+    start = time.perf_counter()
+    manifests = generate_report(data_paths, args.output, args.processes, args.dpi, args.force)
+    for manifest in manifests:
+        status = 'cached' if manifest['cached'] else 'rendered'
+        print(f"{manifest['country']}: {len(manifest['images'])} figures ({status})")
+    print(f"Report written to {os.path.join(args.output, 'index.html')} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Load-test a running query service with concurrent clients.
+
+Sends a mix of dashboard queries from several threads, first against a cold
+cache and then again warm, and reports throughput and latency percentiles.
+
+Usage:
+    python scripts/run_query_service.py &
+    python scripts/load_test_query_service.py --clients 16 --requests 2000
+"""
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def build_queries(base_url):
+    with urllib.request.urlopen(f"{base_url}/countries") as response:
+        countries = [row['country'] for row in json.load(response)]
+    queries = ['/countries', '/daytime?metric=GHI', '/daytime?metric=DNI', '/daytime?metric=DHI']
+    for country in countries:
+        name = urllib.request.quote(country)
+        for metric in ['GHI', 'DNI', 'DHI']:
+            queries += [
+                f'/daily?country={name}&metric={metric}',
+                f'/monthly?country={name}&metric={metric}',
+                f'/hourly?country={name}&metric={metric}',
+                f'/daily?country={name}&metric={metric}&format=arrow',
+            ]
+        queries += [
+            f'/correlation?country={name}',
+            f'/cleaning?country={name}&window=1h&normalize=GHI',
+        ]
+    return queries
+
+
+def timed_get(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def run_round(base_url, queries, total, clients):
+    urls = [base_url + queries[i % len(queries)] for i in range(total)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(timed_get, urls))
+    elapsed = time.perf_counter() - start
+    latencies = np.array([r[0] for r in results]) * 1000
+    errors = sum(status != 200 for _, status in results)
+    return elapsed, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8502')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    queries = build_queries(args.url)
+    rounds = [('cold', len(queries)), ('warm', args.requests)]
+    for label, total in rounds:
+        elapsed, latencies, errors = run_round(args.url, queries, total, args.clients)
+        print(f"{label}: {total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s), "
+              f"p50 {np.percentile(latencies, 50):.1f}ms, p95 {np.percentile(latencies, 95):.1f}ms, "
+              f"max {latencies.max():.1f}ms, errors {errors}")
+
+    with urllib.request.urlopen(f"{args.url}/health") as response:
+        print(json.load(response))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Serve the dashboard's aggregations as JSON/Arrow over a local HTTP API.
+
+The data is loaded once and shared by every request. Endpoints (all GET):
+
+    /health
+    /countries
+    /daily?country=Benin&metric=GHI&start=2021-09-01&end=2021-09-30
+    /monthly?country=Benin&metric=GHI
+    /hourly?country=Benin&metric=GHI
+    /daytime?metric=GHI&countries=Benin,Togo
+    /correlation?country=Benin&columns=GHI,DNI,DHI
+    /cleaning?country=Benin&window=1h&normalize=GHI[&detail=events]
+
+Add ``format=arrow`` for an Arrow IPC stream instead of JSON.
+
+Usage:
+    python scripts/run_query_service.py
+    python scripts/run_query_service.py --data Benin=data/benin_clean.csv --port 8502
+    python scripts/run_query_service.py --live Benin=data/live/benin:data/benin_clean.csv
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.preprocessing.ingestion import StationFeed
+from src.preprocessing.preprocessor import load_station_data
+from src.service.query_service import QueryService, make_server, start_refresh_thread
+
+DEFAULT_DATA_PATHS = {
+    "Benin": "data/benin_clean.csv",
+    "Sierra Leone": "data/sierraleone_clean.csv",
+    "Togo": "data/togo_clean.csv"
+}
+
+
+def parse_pairs(values):
+    pairs = {}
+    for value in values:
+        country, sep, path = value.partition('=')
+        if not sep:
+            raise SystemExit(f"Expected COUNTRY=PATH, got {value!r}")
+        pairs[country] = path
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', nargs='+', metavar='COUNTRY=PATH',
+                        help='cleaned CSV per country (defaults to data/<country>_clean.csv)')
+    parser.add_argument('--live', nargs='+', metavar='COUNTRY=SOURCE:STORE',
+                        help='live station feeds to ingest instead of static CSVs')
+    parser.add_argument('--refresh', type=float, default=5.0, help='seconds between live feed polls')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--cache-size', type=int, default=512)
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    feeds = {}
+    if args.live:
+        for country, spec in parse_pairs(args.live).items():
+            source, _, store = spec.partition(':')
+            feeds[country] = StationFeed(source, store, station=country)
+        # Feeds without a store yet join the service once their first rows are ingested
+        dfs = {country: feed.data for country, feed in feeds.items() if feed.data is not None}
+    else:
+        data_paths = parse_pairs(args.data) if args.data else DEFAULT_DATA_PATHS
+        dfs = {country: load_station_data(path) for country, path in data_paths.items()}
+
+    service = QueryService(dfs, feeds, cache_size=args.cache_size)
+    if feeds:
+        start_refresh_thread(service, args.refresh)
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"Serving {', '.join(dfs or feeds)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import pandas as pd
+
+DAYTIME_HOURS = (6, 18)
+
+
+def filter_date_range(df, start=None, end=None):
+    """Rows between two dates, both inclusive (whole days).
+
+    Slices the index by label, so ``df`` must be sorted by time (the loaders sort it).
+    """
+    start = None if start is None else str(pd.Timestamp(start).date())
+    end = None if end is None else str(pd.Timestamp(end).date())
+    return df.loc[start:end]
+
+
+def filter_daytime(df, hours=DAYTIME_HOURS):
+    hour = df.index.hour
+    return df[(hour >= hours[0]) & (hour <= hours[1])]
+
+
+def daily_means(df, metric):
+    return df[metric].resample('D').mean()
+
+
+def monthly_means(df, metric):
+    return df[metric].resample('MS').mean()
+
+
+def hourly_pattern(df, metric):
+    """Mean and standard deviation of a metric for each hour of the day."""
+    pattern = df.groupby(df.index.hour)[metric].agg(['mean', 'std'])
+    pattern.index.name = 'Hour'
+    return pattern
+
+
+def daytime_averages(dfs, metric, hours=DAYTIME_HOURS):
+    return {country: filter_daytime(df, hours)[metric].mean() for country, df in dfs.items()}
+
+
+def correlation_matrix(df, columns):
+    return df[columns].corr()
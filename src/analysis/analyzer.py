@@ -1,17 +1,19 @@
 from scipy import stats
 import pandas as pd
 import numpy as np
+from src.analysis.profiling import DataProfile
 
 def summarize_and_check_missing(df, threshold=0.05):
+    # One pass over the data; also accepts a DataProfile built with profile_csv/profile_chunks
+    profile = df if isinstance(df, DataProfile) else DataProfile.from_frame(df)
     print("Summary Statistics & Missing-Value Report:")
-    print(df.describe())
+    print(profile.describe())
     print()
     print("Missing Values:")
-    print(df.isna().sum())
+    print(profile.missing)
 
     print("Checking the columns containing missing values rate greater than 5%:")
-    missing_percent = df.isna().mean()
-    high_missing = missing_percent[missing_percent > threshold]
+    high_missing = profile.high_missing(threshold)
     return high_missing
 
 def detect_and_remove_outliers(df, columns):
@@ -22,10 +24,24 @@ def detect_and_remove_outliers(df, columns):
     print("removing outliers...")
     return df[~outlier_mask]
 
-def normalize_negative_to_zero(df, columns):
+def remove_outliers_with_profile(df, columns, profile, verbose=True):
+    # Same |z| > 3 rule as detect_and_remove_outliers, scored against a running
+    # DataProfile so new rows can be checked without rescanning history
+    mean = profile.mean[columns]
+    std = np.sqrt(profile.m2[columns] / profile.count[columns])
+    z_scores = ((df[columns] - mean) / std).abs()
+    outlier_mask = (z_scores > 3).any(axis=1)
+    if verbose:
+        print(f"Number of outliers: {outlier_mask.sum()}")
+
+        print("removing outliers...")
+    return df[~outlier_mask]
+
+def normalize_negative_to_zero(df, columns, verbose=True):
     for col in columns:
-        invalid_count = (df[col] < 0).sum()
-        print(f"{col}: {invalid_count} values < 0")
+        if verbose:
+            invalid_count = (df[col] < 0).sum()
+            print(f"{col}: {invalid_count} values < 0")
         df[col] = df[col].clip(lower=0)
 
     return df
\ No newline at end of file
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def find_cleaning_events(df, flag_col='Cleaning'):
+    """Return the start/end timestamps of every run of consecutive cleaning flags."""
+    flag = df[flag_col].fillna(0).to_numpy() > 0
+    padded = np.concatenate(([False], flag, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return pd.DataFrame({
+        'event_start': df.index[starts],
+        'event_end': df.index[ends],
+    })
+
+
+def _window_length(index, window):
+    step = pd.Series(index).diff().median()
+    if pd.isna(step) or step <= pd.Timedelta(0):
+        raise ValueError("Index must be a sorted DatetimeIndex with a regular sampling interval")
+    return int(pd.Timedelta(window) / step)
+
+
+def extract_event_windows(df, columns, window='1h', flag_col='Cleaning'):
+    """Extract fixed before/after windows around every cleaning event.
+
+    Window bounds are located with ``searchsorted`` on the sorted index and the
+    samples are gathered from a strided view, so all events are handled at once.
+    Returns ``(events, before, after)`` where ``before``/``after`` have shape
+    ``(n_events, n_columns, n_samples)``. Events whose windows run past the ends
+    of the data or contain gaps are flagged with ``valid == False`` and filled
+    with NaN.
+    """
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    index = df.index
+    window = pd.Timedelta(window)
+    n = _window_length(index, window)
+
+    events = find_cleaning_events(df, flag_col)
+    values = df[columns].to_numpy(dtype=float)
+    n_events = len(events)
+    empty = np.full((n_events, len(columns), n), np.nan)
+    if n_events == 0 or n == 0 or len(df) < n:
+        events['valid'] = False
+        return events, empty, empty.copy()
+
+    # Windows are [start - window, start) and (end, end + window]
+    before_stop = index.searchsorted(events['event_start'], side='left')
+    before_start = index.searchsorted(events['event_start'] - window, side='left')
+    after_start = index.searchsorted(events['event_end'], side='right')
+    after_stop = index.searchsorted(events['event_end'] + window, side='right')
+
+    valid = ((before_stop - before_start) >= n) & ((after_stop - after_start) >= n)
+    valid &= (before_stop - n >= 0) & (after_start + n <= len(df))
+    events['valid'] = valid
+
+    # (n_rows - n + 1, n_columns, n) view, no copy until rows are gathered
+    strided = sliding_window_view(values, n, axis=0)
+    rows_before = np.where(valid, before_stop - n, 0)
+    rows_after = np.where(valid, after_start, 0)
+    before = strided[rows_before]
+    after = strided[rows_after]
+    before[~valid] = np.nan
+    after[~valid] = np.nan
+    return events, before, after
+
+
+def compute_cleaning_uplift(df, sensors=('ModA', 'ModB'), window='1h',
+                            normalize_by=None, flag_col='Cleaning'):
+    """Compute the per-event change in sensor output across each cleaning event.
+
+    With ``normalize_by='GHI'`` each window is reduced to ``sum(sensor) / sum(GHI)``
+    instead of a plain mean, which removes changes in sky conditions between the
+    before and after windows. In both modes a window with any missing sample
+    gives NaN for that event.
+    """
+    sensors = list(sensors)
+    columns = sensors + ([normalize_by] if normalize_by else [])
+    events, before, after = extract_event_windows(df, columns, window, flag_col)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if normalize_by:
+            # Plain sums, so a window with missing samples gives NaN just like the mean does
+            before_level = before[:, :-1].sum(axis=2) / before[:, -1:].sum(axis=2)
+            after_level = after[:, :-1].sum(axis=2) / after[:, -1:].sum(axis=2)
+        else:
+            before_level = before.mean(axis=2)
+            after_level = after.mean(axis=2)
+        uplift = after_level - before_level
+        uplift_pct = uplift / before_level * 100
+    for arr in (before_level, after_level, uplift, uplift_pct):
+        arr[~np.isfinite(arr)] = np.nan
+
+    for i, sensor in enumerate(sensors):
+        events[f'{sensor}_before'] = before_level[:, i]
+        events[f'{sensor}_after'] = after_level[:, i]
+        events[f'{sensor}_uplift'] = uplift[:, i]
+        events[f'{sensor}_uplift_pct'] = uplift_pct[:, i]
+    return events
+
+
+def summarize_cleaning_uplift(events, sensors=('ModA', 'ModB')):
+    """Aggregate per-event uplift into one row per sensor."""
+    valid = events[events['valid']]
+    rows = []
+    for sensor in sensors:
+        uplift = valid[f'{sensor}_uplift']
+        uplift_pct = valid[f'{sensor}_uplift_pct']
+        rows.append({
+            'Sensor': sensor,
+            'Events': int(uplift.notna().sum()),
+            'Mean Before': valid[f'{sensor}_before'].mean(),
+            'Mean After': valid[f'{sensor}_after'].mean(),
+            'Mean Uplift': uplift.mean(),
+            'Median Uplift': uplift.median(),
+            'Mean Uplift (%)': uplift_pct.mean(),
+            'Events Improved (%)': (uplift > 0).sum() / max(uplift.notna().sum(), 1) * 100,
+        })
+    return pd.DataFrame(rows).set_index('Sensor')
@@ -0,0 +1,149 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def compute_moments(values):
+    """Return per-column (n, mean, m2) moments of a 2D array, ignoring NaN."""
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = np.sum(~np.isnan(values), axis=0).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(values, axis=0) / n
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+    mean[n == 0] = 0.0
+    return n, mean, m2
+
+
+def merge_moments(a, b):
+    """Combine two (n, mean, m2) moment tuples (Chan et al. parallel update)."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n > 0, mean_a + delta * n_b / n, 0.0)
+        m2 = m2_a + m2_b + np.where(n > 0, delta ** 2 * n_a * n_b / n, 0.0)
+    return n, mean, m2
+
+
+def anova_from_moments(group_moments):
+    """One-way ANOVA F statistic and p-value from per-group moments.
+
+    ``group_moments`` is a list of (n, mean, m2) tuples, one per group, each
+    holding arrays with one entry per metric.
+    """
+    n = np.array([g[0] for g in group_moments])
+    mean = np.array([g[1] for g in group_moments])
+    m2 = np.array([g[2] for g in group_moments])
+
+    total_n = n.sum(axis=0)
+    k = (n > 0).sum(axis=0)
+    grand_mean = (n * mean).sum(axis=0) / total_n
+    ss_between = (n * (mean - grand_mean) ** 2).sum(axis=0)
+    ss_within = m2.sum(axis=0)
+    df_between = k - 1
+    df_within = total_n - k
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+    p_value = stats.f.sf(f_stat, df_between, df_within)
+    return f_stat, p_value
+
+
+def _average_ranks(values):
+    # 1-based ranks with ties sharing the average rank, plus the tie term sum(t^3 - t)
+    order = np.argsort(values, kind='mergesort')
+    sorted_values = values[order]
+    boundaries = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1], [True])))
+    counts = np.diff(boundaries)
+    run_ranks = boundaries[:-1] + (counts + 1) / 2.0
+    ranks = np.empty(len(values))
+    ranks[order] = np.repeat(run_ranks, counts)
+    tie_term = float(np.sum(counts.astype(float) ** 3 - counts))
+    return ranks, tie_term
+
+
+def kruskal_from_samples(samples):
+    """Kruskal-Wallis H statistic and p-value from a single global ranking."""
+    samples = [s[~np.isnan(s)] for s in samples]
+    sizes = np.array([len(s) for s in samples])
+    samples = [s for s in samples if len(s)]
+    sizes = sizes[sizes > 0]
+    total_n = sizes.sum()
+    if len(samples) < 2:
+        return np.nan, np.nan
+
+    ranks, tie_term = _average_ranks(np.concatenate(samples))
+    group = np.repeat(np.arange(len(samples)), sizes)
+    rank_sums = np.bincount(group, weights=ranks)
+    h = 12.0 / (total_n * (total_n + 1)) * np.sum(rank_sums ** 2 / sizes) - 3 * (total_n + 1)
+    correction = 1 - tie_term / (total_n ** 3 - total_n)
+    if correction == 0:
+        return np.nan, np.nan
+    h /= correction
+    return h, stats.chi2.sf(h, len(samples) - 1)
+
+
+def _load_partition(partition, metrics, daytime_hours):
+    if isinstance(partition, pd.DataFrame):
+        df = partition
+    else:
+        usecols = list(metrics) + (['Timestamp'] if daytime_hours else [])
+        df = pd.read_csv(partition, usecols=usecols, parse_dates=['Timestamp'] if daytime_hours else None)
+    if daytime_hours:
+        timestamps = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.to_datetime(df['Timestamp'])
+        hour = np.asarray(timestamps.hour)
+        df = df[(hour >= daytime_hours[0]) & (hour <= daytime_hours[1])]
+    return df[list(metrics)].to_numpy(dtype=float)
+
+
+def _summarize_partition(partition, metrics, daytime_hours, keep_values):
+    values = _load_partition(partition, metrics, daytime_hours)
+    return compute_moments(values), (values if keep_values else None)
+
+
+def compare_groups(groups, metrics=('GHI', 'DNI', 'DHI'), daytime_hours=None,
+                   kruskal=True, processes=None):
+    """Run one-way ANOVA and Kruskal-Wallis across groups for several metrics at once.
+
+    ``groups`` maps a group name (e.g. country) to a DataFrame, a CSV path, or a
+    list of those partitions. Each partition is reduced to mergeable moments, so
+    ANOVA never needs the raw values together; Kruskal-Wallis keeps only the
+    metric columns for the global ranking. With ``processes`` set,
+    partitions are summarized in a process pool.
+    """
+    metrics = list(metrics)
+    tasks = []
+    for name, partitions in groups.items():
+        if isinstance(partitions, (pd.DataFrame, str)):
+            partitions = [partitions]
+        tasks.extend((name, p) for p in partitions)
+
+    args = [(p, metrics, daytime_hours, kruskal) for _, p in tasks]
+    if processes:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_summarize_partition, *zip(*args)))
+    else:
+        results = [_summarize_partition(*a) for a in args]
+
+    moments, samples = {}, {}
+    for (name, _), (partition_moments, values) in zip(tasks, results):
+        moments[name] = merge_moments(moments[name], partition_moments) if name in moments else partition_moments
+        if kruskal:
+            samples.setdefault(name, []).append(values)
+
+    f_stat, f_p = anova_from_moments(list(moments.values()))
+    report = pd.DataFrame({'ANOVA F': f_stat, 'ANOVA p-value': f_p}, index=metrics)
+    if kruskal:
+        group_values = [np.concatenate(v) for v in samples.values()]
+        h_results = [
+            kruskal_from_samples([v[:, i] for v in group_values])
+            for i in range(len(metrics))
+        ]
+        report['Kruskal H'] = [h for h, _ in h_results]
+        report['Kruskal p-value'] = [p for _, p in h_results]
+    report.index.name = 'Metric'
+    return report
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+
+DESCRIBE_ROWS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+QUANTILES = [0.25, 0.5, 0.75]
+
+# Normalized rank error of KLLSketch quantiles at the default k=200 (99% confidence):
+# a reported 50% is somewhere between the true 48.35% and 51.65% quantiles.
+QUANTILE_RANK_ERROR = 0.0165
+# Compaction coin flips are seeded so the same data always reports the same quartiles
+DEFAULT_SEED = 0
+
+
+class KLLSketch:
+    """Mergeable approximate-quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items live in levels of compactors; an item on level ``h`` stands for
+    ``2**h`` original values. Whole arrays are added at once and compacted
+    with numpy, so updating with a chunk is a handful of sorts.
+    """
+
+    def __init__(self, k=200, seed=DEFAULT_SEED):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # Keep one item back when the count is odd so no weight is lost
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            paired = items[:len(items) - len(keep)]
+            promoted = paired[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            # Capacities shrink as levels are added, so recheck from the bottom
+            level = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate((self.levels[0], values))
+            self._compress()
+        return self
+
+    def merge(self, other):
+        merged = KLLSketch(self.k)
+        merged._rng = self._rng
+        merged.n = self.n + other.n
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate((
+                self.levels[h] if h < len(self.levels) else np.empty(0),
+                other.levels[h] if h < len(other.levels) else np.empty(0),
+            ))
+            for h in range(depth)
+        ]
+        merged._compress()
+        return merged
+
+    def quantile(self, qs):
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='mergesort')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        # Same convention as linear-interpolation quantiles at the endpoints
+        targets = qs * (cumulative[-1] - 1) + 1
+        idx = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(values) - 1)
+        return values[idx]
+
+
+class DataProfile:
+    """Single-pass, mergeable column profile of one or more DataFrame chunks.
+
+    Tracks rows, missing values, count/mean/variance (Chan-Welford merge),
+    min/max and negative-value counts exactly, and quartiles through a
+    :class:`KLLSketch` per numeric column. Profiles from different chunks,
+    files, countries or years combine with :meth:`merge`.
+    """
+
+    def __init__(self, k=200, seed=DEFAULT_SEED):
+        self.k = k
+        self.seed = seed
+        self.rows = 0
+        self.missing = pd.Series(dtype='int64')
+        self.count = pd.Series(dtype=float)
+        self.mean = pd.Series(dtype=float)
+        self.m2 = pd.Series(dtype=float)
+        self.min = pd.Series(dtype=float)
+        self.max = pd.Series(dtype=float)
+        self.negative = pd.Series(dtype='int64')
+        self.sketches = {}
+        self.non_numeric = set()
+
+    @classmethod
+    def from_frame(cls, df, k=200, seed=DEFAULT_SEED):
+        profile = cls(k, seed)
+        profile.rows = len(df)
+        profile.missing = df.isna().sum()
+
+        numeric = df.select_dtypes(include='number')
+        # A column that is entirely empty in this chunk parses as float; treat it as numeric for now
+        profile.non_numeric = set(df.columns) - set(numeric.columns)
+        values = numeric.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, values, 0.0).sum(axis=0) / n
+            m2 = np.where(valid, (values - mean) ** 2, 0.0).sum(axis=0)
+        columns = numeric.columns
+        profile.count = pd.Series(n, index=columns)
+        profile.mean = pd.Series(np.where(n > 0, mean, 0.0), index=columns)
+        profile.m2 = pd.Series(m2, index=columns)
+        profile.min = pd.Series(np.where(valid, values, np.inf).min(axis=0, initial=np.inf), index=columns)
+        profile.max = pd.Series(np.where(valid, values, -np.inf).max(axis=0, initial=-np.inf), index=columns)
+        profile.negative = pd.Series((valid & (values < 0)).sum(axis=0), index=columns)
+        profile.sketches = {
+            col: KLLSketch(k, seed).update(values[valid[:, i], i])
+            for i, col in enumerate(columns)
+        }
+        return profile
+
+    def update(self, chunk):
+        """Fold one more chunk into this profile in place."""
+        # Seed each chunk's sketches from its position in the stream, so chunks flip different coins
+        seed = None if self.seed is None else (self.seed, self.rows)
+        merged = self.merge(DataProfile.from_frame(chunk, self.k, seed))
+        self.__dict__.update(merged.__dict__)
+        return self
+
+    def merge(self, other):
+        """Return a new profile covering the rows of both profiles."""
+        merged = DataProfile(self.k, self.seed)
+        merged.rows = self.rows + other.rows
+        columns = self.missing.index.union(other.missing.index, sort=False)
+        # A column absent from one side counts as missing for all of that side's rows
+        merged.missing = (
+            self.missing.reindex(columns, fill_value=self.rows)
+            + other.missing.reindex(columns, fill_value=other.rows)
+        ).astype('int64')
+
+        # Text anywhere makes the column non-numeric everywhere
+        merged.non_numeric = self.non_numeric | other.non_numeric
+        numeric = self.count.index.union(other.count.index, sort=False)
+        numeric = numeric[~numeric.isin(list(merged.non_numeric))]
+
+        n_a = self.count.reindex(numeric, fill_value=0.0)
+        n_b = other.count.reindex(numeric, fill_value=0.0)
+        mean_a = self.mean.reindex(numeric, fill_value=0.0)
+        mean_b = other.mean.reindex(numeric, fill_value=0.0)
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        with np.errstate(invalid='ignore', divide='ignore'):
+            merged.mean = (mean_a + delta * n_b / n).where(n > 0, 0.0)
+            merged.m2 = (
+                self.m2.reindex(numeric, fill_value=0.0)
+                + other.m2.reindex(numeric, fill_value=0.0)
+                + (delta ** 2 * n_a * n_b / n).where(n > 0, 0.0)
+            )
+        merged.count = n
+        merged.min = np.minimum(self.min.reindex(numeric, fill_value=np.inf),
+                                other.min.reindex(numeric, fill_value=np.inf))
+        merged.max = np.maximum(self.max.reindex(numeric, fill_value=-np.inf),
+                                other.max.reindex(numeric, fill_value=-np.inf))
+        merged.negative = (self.negative.reindex(numeric, fill_value=0)
+                           + other.negative.reindex(numeric, fill_value=0)).astype('int64')
+        merged.sketches = {}
+        for col in numeric:
+            a, b = self.sketches.get(col), other.sketches.get(col)
+            merged.sketches[col] = a.merge(b) if a is not None and b is not None else (a if a is not None else b)
+        return merged
+
+    def describe(self):
+        """Same layout as ``DataFrame.describe()``; quartiles are approximate."""
+        count = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / (count - 1)).where(count > 1)
+        quartiles = pd.DataFrame(
+            {col: self.sketches[col].quantile(QUANTILES) for col in count.index},
+            index=['25%', '50%', '75%'],
+        )
+        stats = pd.DataFrame({
+            'count': count,
+            'mean': self.mean.where(count > 0),
+            'std': std,
+            'min': self.min.where(count > 0),
+            'max': self.max.where(count > 0),
+        }).T
+        return pd.concat([stats, quartiles]).loc[DESCRIBE_ROWS]
+
+    def missing_rate(self):
+        return self.missing / self.rows if self.rows else self.missing.astype(float)
+
+    def high_missing(self, threshold=0.05):
+        rate = self.missing_rate()
+        return rate[rate > threshold]
+
+    def summary(self):
+        """Per-column report: describe() statistics plus missing and negative counts."""
+        report = self.describe().T
+        report.insert(1, 'missing', self.missing.reindex(report.index))
+        report.insert(2, 'missing %', (self.missing_rate() * 100).reindex(report.index))
+        report['negative'] = self.negative
+        return report
+
+
+def profile_chunks(chunks, k=200, seed=DEFAULT_SEED):
+    """Profile an iterable of DataFrame chunks in one streaming pass."""
+    profile = DataProfile(k, seed)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def profile_csv(path, chunksize=100_000, k=200, seed=DEFAULT_SEED, **read_csv_kwargs):
+    """Profile a CSV that need not fit in memory."""
+    return profile_chunks(pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs), k, seed)
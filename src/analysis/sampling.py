@@ -0,0 +1,159 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class StratifiedReservoir:
+    """Uniform reservoir samples per (station, month, hour) stratum.
+
+    Each stratum keeps at most ``k`` rows plus the number of rows it has seen,
+    so sampled rows carry a weight of ``seen / kept``. New data can be folded in
+    at any time with :meth:`update` (e.g. on every ingest), and the estimators
+    below answer means, quantiles and correlations with confidence intervals.
+    """
+
+    def __init__(self, columns, k=200, seed=None):
+        self.columns = list(columns)
+        self.k = k
+        self.seen = {}
+        self.rows = {}
+        self.times = {}
+        self._rng = np.random.default_rng(seed)
+
+    def copy(self):
+        """An independent copy to update; kept arrays are shared, as updates never write into them."""
+        other = copy.copy(self)
+        other.seen, other.rows, other.times = dict(self.seen), dict(self.rows), dict(self.times)
+        return other
+
+    def update(self, df, station):
+        values = df.reindex(columns=self.columns).to_numpy(dtype=float)
+        times = df.index.to_numpy()
+        keys = df.index.month * 100 + df.index.hour
+        codes, uniques = pd.factorize(np.asarray(keys))
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for i, key in enumerate(uniques):
+            rows = order[bounds[i]:bounds[i + 1]]
+            self._update_stratum((station, key // 100, key % 100), values[rows], times[rows])
+        return self
+
+    def _update_stratum(self, stratum, values, times):
+        # Algorithm R, vectorized over a batch: item t is kept with probability k/t
+        seen = self.seen.get(stratum, 0)
+        kept = self.rows.get(stratum, np.empty((0, len(self.columns))))
+        kept_times = self.times.get(stratum, np.empty(0, dtype=times.dtype))
+
+        fill = max(0, min(self.k - len(kept), len(values)))
+        kept = np.concatenate((kept, values[:fill]))
+        kept_times = np.concatenate((kept_times, times[:fill]))
+        position = seen + fill + np.arange(1, len(values) - fill + 1)
+        accept = self._rng.random(len(position)) < self.k / position
+        slots = self._rng.integers(self.k, size=accept.sum())
+        # Later items overwrite earlier ones in the same slot, as in the sequential algorithm
+        kept[slots] = values[fill:][accept]
+        kept_times[slots] = times[fill:][accept]
+
+        self.seen[stratum] = seen + len(values)
+        self.rows[stratum] = kept
+        self.times[stratum] = kept_times
+
+    def sample(self, stations=None, start=None, end=None):
+        """Sampled rows with ``weight`` (rows represented) and ``stratum`` columns."""
+        frames = []
+        for stratum, values in self.rows.items():
+            if stations is not None and stratum[0] not in stations:
+                continue
+            frame = pd.DataFrame(values, columns=self.columns, index=pd.DatetimeIndex(self.times[stratum]))
+            frame['weight'] = self.seen[stratum] / len(values)
+            frame['stratum'] = [stratum] * len(frame)
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=self.columns + ['weight', 'stratum'])
+        sample = pd.concat(frames).sort_index()
+        if start is not None or end is not None:
+            # A uniform sample stays uniform within any time range, so weights are unchanged
+            sample = sample.loc[start:end]
+        return sample
+
+
+def _strata(sample, column):
+    data = sample[[column, 'weight', 'stratum']].dropna()
+    return data.groupby('stratum', sort=False)
+
+
+def estimate_mean(sample, column, confidence=0.95):
+    """Stratified estimate of the mean; returns (mean, half-width of the confidence interval)."""
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    groups = _strata(sample, column)
+    n_h = groups[column].count()
+    mean_h = groups[column].mean()
+    var_h = groups[column].var(ddof=1).fillna(0.0)
+    population_h = groups['weight'].sum()
+    total = population_h.sum()
+    if total == 0:
+        return np.nan, np.nan
+    share = population_h / total
+    mean = float((share * mean_h).sum())
+    fpc = (1 - n_h / population_h).clip(lower=0)
+    variance = float((share ** 2 * fpc * var_h / n_h).sum())
+    return mean, z * np.sqrt(variance)
+
+
+def _weighted_quantile(values, weights, q):
+    order = np.argsort(values)
+    values, weights = values[order], weights[order]
+    cumulative = np.cumsum(weights) / weights.sum()
+    return values[np.minimum(np.searchsorted(cumulative, q), len(values) - 1)]
+
+
+def estimate_quantile(sample, column, q, confidence=0.95):
+    """Weighted quantile with a Woodruff confidence interval; returns (estimate, low, high)."""
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    data = sample[[column, 'weight', 'stratum']].dropna()
+    if data.empty:
+        return np.nan, np.nan, np.nan
+    values = data[column].to_numpy()
+    weights = data['weight'].to_numpy()
+    estimate = _weighted_quantile(values, weights, q)
+
+    # Variance of the estimated share of rows at or below the estimate
+    groups = data.assign(below=(values <= estimate).astype(float)).groupby('stratum', sort=False)
+    n_h = groups['below'].count()
+    p_h = groups['below'].mean()
+    population_h = groups['weight'].sum()
+    share = population_h / population_h.sum()
+    fpc = (1 - n_h / population_h).clip(lower=0)
+    se = np.sqrt(float((share ** 2 * fpc * p_h * (1 - p_h) / np.maximum(n_h - 1, 1)).sum()))
+    low = _weighted_quantile(values, weights, max(q - z * se, 0.0))
+    high = _weighted_quantile(values, weights, min(q + z * se, 1.0))
+    return estimate, low, high
+
+
+def estimate_correlation(sample, columns, confidence=0.95):
+    """Weighted Pearson correlation matrix with Fisher-z confidence bounds.
+
+    The interval uses the Kish effective sample size of the weighted sample.
+    Returns (corr, low, high) DataFrames.
+    """
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    data = sample[list(columns) + ['weight']].dropna()
+    weights = data['weight'].to_numpy()
+    values = data[list(columns)].to_numpy(dtype=float)
+    if len(data) > 1:
+        cov = np.cov(values, rowvar=False, aweights=weights)
+        std = np.sqrt(np.diag(cov))
+        corr = cov / np.outer(std, std)
+    else:
+        corr = np.full((len(columns), len(columns)), np.nan)
+    n_eff = weights.sum() ** 2 / (weights ** 2).sum() if len(data) else 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fisher = np.arctanh(np.clip(corr, -0.999999, 0.999999))
+        half = z / np.sqrt(max(n_eff - 3, 1))
+    low = np.tanh(fisher - half)
+    high = np.tanh(fisher + half)
+    np.fill_diagonal(low, 1.0)
+    np.fill_diagonal(high, 1.0)
+    return tuple(pd.DataFrame(a, index=columns, columns=columns) for a in (corr, low, high))
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+SECTOR_LABELS_16 = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE',
+                    'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+# Fixed speed classes (m/s) so tables from different chunks and stations line up
+SPEED_BINS = [0, 1, 2, 3, 4, 5, 6, np.inf]
+
+
+def sector_labels(sectors):
+    if sectors == 16:
+        return SECTOR_LABELS_16
+    width = 360 / sectors
+    return [f"{i * width:g}°" for i in range(sectors)]
+
+
+def speed_labels(speed_bins=SPEED_BINS):
+    return [
+        f"{lo:g}-{hi:g}" if np.isfinite(hi) else f"≥{lo:g}"
+        for lo, hi in zip(speed_bins[:-1], speed_bins[1:])
+    ]
+
+
+def _bin_codes(wd, ws, sectors, speed_bins):
+    # Flat cell code sector * n_speed + speed_class, or -1 for missing/invalid samples
+    wd = np.asarray(wd, dtype=float)
+    ws = np.asarray(ws, dtype=float)
+    width = 360.0 / sectors
+    finite = np.isfinite(wd) & np.isfinite(ws)
+    sector = (np.mod(np.where(finite, wd, 0.0) + width / 2, 360.0) // width).astype(np.int64)
+    speed = np.searchsorted(speed_bins, ws, side='right') - 1
+    n_speed = len(speed_bins) - 1
+    valid = finite & (speed >= 0) & (speed < n_speed)
+    return np.where(valid, sector * n_speed + speed, -1)
+
+
+def _to_frame(counts, sectors, speed_bins):
+    return pd.DataFrame(
+        counts.reshape(sectors, len(speed_bins) - 1),
+        index=pd.Index(sector_labels(sectors), name='Direction'),
+        columns=pd.Index(speed_labels(speed_bins), name='Speed (m/s)'),
+    )
+
+
+def wind_rose_table(df, sectors=16, speed_bins=SPEED_BINS, wd_col='WD', ws_col='WS'):
+    """Count samples per direction sector (rows) and speed class (columns).
+
+    Tables built with the same ``sectors``/``speed_bins`` are mergeable: the
+    table of a concatenation equals the sum of the tables of its parts.
+    """
+    codes = _bin_codes(df[wd_col], df[ws_col], sectors, speed_bins)
+    n_cells = sectors * (len(speed_bins) - 1)
+    counts = np.bincount(codes[codes >= 0], minlength=n_cells)
+    return _to_frame(counts, sectors, speed_bins)
+
+
+def wind_rose_tables_by(df, by, sectors=16, speed_bins=SPEED_BINS, wd_col='WD', ws_col='WS'):
+    """Build one table per group (e.g. month or station) in a single bincount.
+
+    ``by`` is anything ``pd.factorize`` accepts with one value per row, such as
+    ``df.index.month`` or ``df['Country']``. Returns a dict of group -> table.
+    """
+    codes = _bin_codes(df[wd_col], df[ws_col], sectors, speed_bins)
+    group_codes, groups = pd.factorize(np.asarray(by), sort=True)
+    n_cells = sectors * (len(speed_bins) - 1)
+    keep = (codes >= 0) & (group_codes >= 0)
+    flat = group_codes[keep] * n_cells + codes[keep]
+    counts = np.bincount(flat, minlength=len(groups) * n_cells).reshape(len(groups), n_cells)
+    return {group: _to_frame(counts[i], sectors, speed_bins) for i, group in enumerate(groups)}
+
+
+def to_frequency(table):
+    """Convert a count table to percentages of all samples."""
+    total = table.to_numpy().sum()
+    return table * (100.0 / total) if total else table.astype(float)
+
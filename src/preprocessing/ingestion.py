@@ -0,0 +1,367 @@
+import copy
+import glob
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.analyzer import normalize_negative_to_zero, remove_outliers_with_profile
+from src.analysis.hypothesis_tests import compute_moments, merge_moments
+from src.analysis.profiling import DataProfile
+from src.analysis.sampling import StratifiedReservoir
+
+IRRADIANCE_COLUMNS = ['GHI', 'DNI', 'DHI']
+OUTLIER_COLUMNS = ['GHI', 'DNI', 'DHI', 'ModA', 'ModB', 'WS', 'WSgust']
+AGGREGATE_COLUMNS = ['GHI', 'DNI', 'DHI', 'ModA', 'ModB', 'TModA', 'TModB', 'Tamb', 'RH', 'WS']
+
+logger = logging.getLogger(__name__)
+
+
+def _add_tables(total, new):
+    return new if total is None else total.add(new, fill_value=0)
+
+
+class _AppendBuffer:
+    """Column arrays with spare capacity, so appending rows never copies history.
+
+    Capacity doubles when full, which keeps appends amortized O(new rows).
+    :meth:`frame` wraps the filled part in a DataFrame without copying it; the
+    arrays are read-only so consumers cannot write into the shared history.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.index = None
+        self.columns = {}
+
+    def append(self, df):
+        n = len(df)
+        if self.index is None:
+            capacity = max(2 * n, 1024)
+            self.index = np.empty(capacity, dtype=df.index.dtype)
+            self.columns = {c: np.empty(capacity, dtype=df[c].dtype) for c in df.columns}
+        elif self.size + n > len(self.index):
+            capacity = max(2 * len(self.index), self.size + n)
+            self.index = self._grow(self.index, capacity)
+            self.columns = {c: self._grow(a, capacity) for c, a in self.columns.items()}
+
+        end = self.size + n
+        self.index[self.size:end] = df.index.to_numpy()
+        for column, array in self.columns.items():
+            values = df[column].to_numpy() if column in df.columns else np.full(n, np.nan)
+            dtype = np.result_type(array.dtype, values.dtype)
+            if dtype != array.dtype:
+                # e.g. an int column that arrives with missing values: upcast once
+                array = self.columns[column] = array.astype(dtype)
+            array[self.size:end] = values
+        self.size = end
+
+    def _grow(self, array, capacity):
+        grown = np.empty(capacity, dtype=array.dtype)
+        grown[:self.size] = array[:self.size]
+        return grown
+
+    def _view(self, array, size):
+        view = array[:size]
+        view.flags.writeable = False
+        return view
+
+    def frame(self):
+        size, index, columns = self.size, self.index, self.columns
+        return pd.DataFrame(
+            {c: self._view(a, size) for c, a in columns.items()},
+            index=pd.DatetimeIndex(self._view(index, size), name='Timestamp', copy=False),
+            copy=False,
+        )
+
+
+class StationFeed:
+    """Append-only ingestion of a live station feed into a stored CSV dataset.
+
+    ``source`` is either a CSV file that the logger appends to, or a directory
+    that CSV files are dropped into. Each :meth:`poll` reads only the bytes
+    added since the last poll, cleans the new rows with the ``src/analysis``
+    rules, appends them to ``store`` and folds them into the daily, monthly and
+    hour-of-day aggregates and the station's stratified reservoir sample.
+    Offsets and aggregates are kept in ``state_path`` so a restart does not
+    rescan history. Malformed numeric values are set to NaN and logged, and
+    offsets only advance once the rows are in the store, so a failed poll
+    is retried rather than dropped.
+
+    One feed can be shared between threads (e.g. Streamlit sessions). Polls
+    are serialized by a lock and publish a new ``state`` in one assignment
+    without modifying the previous one, so the read accessors always see a
+    consistent snapshot.
+    """
+
+    def __init__(self, source, store, state_path=None, keep_data=True, station=None,
+                 outlier_columns=OUTLIER_COLUMNS, aggregate_columns=AGGREGATE_COLUMNS):
+        self.source = source
+        self.store = store
+        self.station = station or os.path.splitext(os.path.basename(store))[0]
+        self.state_path = state_path or f"{store}.ingest.pkl"
+        self.keep_data = keep_data
+        self.outlier_columns = outlier_columns
+        self.aggregate_columns = aggregate_columns
+        self._buffer = _AppendBuffer()
+        self._data = None
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'rb') as f:
+                self.state = pickle.load(f)
+            self._truncate_store(self.state['store_size'])
+            if keep_data and os.path.exists(store):
+                for chunk in self._read_store(chunksize=200_000):
+                    self._keep(chunk)
+        else:
+            self.state = {
+                'offsets': {},
+                'headers': {},
+                'columns': None,
+                'timestamp_format': '%Y-%m-%d %H:%M',
+                'last_timestamp': None,
+                'store_size': 0,
+                'profile': DataProfile(),
+                'daily_sum': None,
+                'daily_count': None,
+                'monthly_sum': None,
+                'monthly_count': None,
+                'hourly': None,
+                'sample': StratifiedReservoir(aggregate_columns),
+            }
+            self._bootstrap()
+
+    def _read_store(self, chunksize=None):
+        reader = pd.read_csv(self.store, chunksize=chunksize)
+        chunks = reader if chunksize else [reader]
+        frames = (self._index_by_timestamp(chunk) for chunk in chunks)
+        return frames if chunksize else next(frames)
+
+    def _truncate_store(self, size):
+        # Rows written past the size recorded in the saved state were never committed
+        # (a crash or error between the append and the state save); the offsets in the
+        # state still point before them, so the next poll appends them again exactly once
+        if os.path.exists(self.store) and os.path.getsize(self.store) > size:
+            with open(self.store, 'r+b') as f:
+                f.truncate(size)
+
+    def _index_by_timestamp(self, df):
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='ISO8601', errors='coerce')
+        return df.dropna(subset=['Timestamp']).set_index('Timestamp')
+
+    def _bootstrap(self):
+        # One-off pass over an existing store to seed the aggregates
+        if not os.path.exists(self.store):
+            return
+        state = self.state
+        first = pd.read_csv(self.store, nrows=1, dtype={'Timestamp': str})
+        if len(first) and len(first['Timestamp'].iloc[0]) > len('YYYY-MM-DD HH:MM'):
+            # Keep appended rows in the same timestamp format as the existing store
+            state['timestamp_format'] = '%Y-%m-%d %H:%M:%S'
+        for chunk in self._read_store(chunksize=200_000):
+            if state['columns'] is None:
+                state['columns'] = ['Timestamp'] + list(chunk.columns)
+            state['profile'].update(chunk[self._present(chunk, self.outlier_columns)])
+            self._update_aggregates(state, chunk)
+            state['last_timestamp'] = chunk.index.max()
+            if self.keep_data:
+                self._keep(chunk)
+        state['store_size'] = os.path.getsize(self.store)
+        self._save_state(state)
+
+    def _present(self, df, columns):
+        return [c for c in columns if c in df.columns]
+
+    def _source_files(self):
+        if os.path.isdir(self.source):
+            return sorted(glob.glob(os.path.join(self.source, '*.csv')))
+        return [self.source] if os.path.exists(self.source) else []
+
+    def _read_new_bytes(self, path, offset, header):
+        """Return ``(new_offset, header, csv_bytes)`` for complete lines past ``offset``, or None."""
+        if os.path.getsize(path) < offset:
+            # File was truncated or rotated; start over, timestamps filter out repeats
+            offset = 0
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Leave a partially written last line for the next poll
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return None
+        new_offset = offset + len(data)
+        if offset == 0:
+            header, _, data = data.partition(b'\n')
+            header += b'\n'
+        return new_offset, header, header + data if data else None
+
+    def _parse(self, data, path):
+        df = pd.read_csv(BytesIO(data), dtype=str, on_bad_lines='warn')
+        # Every stored column but the timestamp and free-text comments is numeric; a malformed
+        # value (e.g. 'ERR' from the logger) becomes NaN rather than failing the whole batch
+        malformed = 0
+        for column in df.columns.drop(['Timestamp', 'Comments'], errors='ignore'):
+            values = pd.to_numeric(df[column], errors='coerce')
+            malformed += int((values.isna() & df[column].notna()).sum())
+            df[column] = values
+        if malformed:
+            logger.warning("%s: %d malformed values replaced with NaN", path, malformed)
+        return df
+
+    def _clean(self, state, df):
+        if 'Comments' in df.columns:
+            df = df.drop('Comments', axis=1)
+        df = self._index_by_timestamp(df)
+        df = df[~df.index.duplicated()].sort_index()
+        last = state['last_timestamp']
+        if last is not None:
+            df = df[df.index > last].copy()
+        if df.empty:
+            return df
+
+        # Polls run in the background every few seconds, so clean without printing
+        df = normalize_negative_to_zero(df, self._present(df, IRRADIANCE_COLUMNS), verbose=False)
+        outlier_columns = self._present(df, self.outlier_columns)
+        state['profile'] = copy.copy(state['profile']).update(df[outlier_columns])
+        return remove_outliers_with_profile(df, outlier_columns, state['profile'], verbose=False)
+
+    def _update_aggregates(self, state, df):
+        # Replaces entries of ``state`` with updated objects and never modifies the old
+        # ones in place, so a poll that fails part-way leaves the committed state intact
+        columns = self._present(df, self.aggregate_columns)
+        values = df[columns]
+        day = df.index.normalize()
+        month = df.index.to_period('M').to_timestamp()
+        state['daily_sum'] = _add_tables(state['daily_sum'], values.groupby(day).sum())
+        state['daily_count'] = _add_tables(state['daily_count'], values.groupby(day).count())
+        state['monthly_sum'] = _add_tables(state['monthly_sum'], values.groupby(month).sum())
+        state['monthly_count'] = _add_tables(state['monthly_count'], values.groupby(month).count())
+
+        state['sample'] = state['sample'].copy().update(values, self.station)
+
+        # Per hour-of-day (n, mean, m2) moments, merged like partitions in hypothesis_tests
+        hours = df.index.hour.to_numpy()
+        hourly = state['hourly'] or {
+            'columns': columns,
+            'moments': [compute_moments(np.empty((0, len(columns)))) for _ in range(24)],
+        }
+        moments = list(hourly['moments'])
+        raw = values.reindex(columns=hourly['columns']).to_numpy(dtype=float)
+        for hour in np.unique(hours):
+            moments[hour] = merge_moments(moments[hour], compute_moments(raw[hours == hour]))
+        state['hourly'] = {'columns': hourly['columns'], 'moments': moments}
+
+    def _append_to_store(self, state, df):
+        columns = state['columns'] or ['Timestamp'] + list(df.columns)
+        state['columns'] = columns
+        out = df.reset_index().reindex(columns=columns)
+        write_header = not os.path.exists(self.store) or os.path.getsize(self.store) == 0
+        out.to_csv(self.store, mode='a', header=write_header, index=False,
+                   date_format=state['timestamp_format'])
+        state['store_size'] = os.path.getsize(self.store)
+
+    def _save_state(self, state):
+        directory, name = os.path.split(os.path.abspath(self.state_path))
+        with tempfile.NamedTemporaryFile(dir=directory, prefix=f"{name}.", suffix='.tmp', delete=False) as f:
+            pickle.dump(state, f)
+        os.replace(f.name, self.state_path)
+
+    def poll(self):
+        """Ingest whatever has been appended since the last poll; returns the number of new rows."""
+        # Held from reading offsets to saving state, so concurrent polls never ingest a row twice
+        with self._lock:
+            return self._poll()
+
+    def _poll(self):
+        # Work on a copy; offsets and aggregates are committed together, only once the
+        # rows are in the store and the state is saved, so a failed poll is simply retried
+        state = dict(self.state, offsets=dict(self.state['offsets']), headers=dict(self.state['headers']))
+        chunks = []
+        for path in self._source_files():
+            read = self._read_new_bytes(path, state['offsets'].get(path, 0), state['headers'].get(path))
+            if read is None:
+                continue
+            state['offsets'][path], state['headers'][path], data = read
+            if data:
+                chunks.append(self._parse(data, path))
+        if state['offsets'] == self.state['offsets']:
+            return 0
+
+        new_rows = self._clean(state, pd.concat(chunks, ignore_index=True)) if chunks else pd.DataFrame()
+        try:
+            if not new_rows.empty:
+                self._append_to_store(state, new_rows)
+                self._update_aggregates(state, new_rows)
+                state['last_timestamp'] = new_rows.index.max()
+            self._save_state(state)
+        except BaseException:
+            self._truncate_store(self.state['store_size'])
+            raise
+        self.state = state
+        if self.keep_data and not new_rows.empty:
+            self._keep(new_rows)
+        return len(new_rows)
+
+    def _keep(self, df):
+        # Shape rows like load_all_data once, as they arrive, so .data never reprocesses history
+        df = df.drop(columns='Comments', errors='ignore').assign(hour=df.index.hour)
+        self._buffer.append(df)
+        self._data = None
+
+    @property
+    def data(self):
+        """The full stored dataset, in the shape ``load_all_data`` returns.
+
+        Rows are kept in preallocated column arrays, so each poll only costs the
+        new rows; the returned frame is a read-only view of them.
+        """
+        with self._lock:
+            if self._data is None and self._buffer.size:
+                self._data = self._buffer.frame()
+            return self._data
+
+    def _daily_tables(self, start, end):
+        state = self.state
+        days = slice(None if start is None else pd.Timestamp(start).normalize(),
+                     None if end is None else pd.Timestamp(end).normalize())
+        return state['daily_sum'].loc[days], state['daily_count'].loc[days]
+
+    def daily_means(self, start=None, end=None):
+        """Daily means of the aggregate columns over whole days from ``start`` to ``end``."""
+        sums, counts = self._daily_tables(start, end)
+        return (sums / counts).asfreq('D')
+
+    def monthly_means(self, start=None, end=None):
+        """Monthly means; with a date range, only the days inside it count, as with a filtered frame."""
+        if start is None and end is None:
+            state = self.state
+            return (state['monthly_sum'] / state['monthly_count']).asfreq('MS')
+        sums, counts = self._daily_tables(start, end)
+        month = sums.index.to_period('M').to_timestamp()
+        return (sums.groupby(month).sum() / counts.groupby(month).sum()).asfreq('MS')
+
+    def range_means(self, start=None, end=None):
+        """Means of the aggregate columns over whole days from ``start`` to ``end``."""
+        sums, counts = self._daily_tables(start, end)
+        return sums.sum() / counts.sum()
+
+    def reservoir(self):
+        """The stratified sample as of the last poll; later polls update a copy, never this object."""
+        return self.state['sample']
+
+    def hourly_stats(self, column):
+        hourly = self.state['hourly']
+        i = hourly['columns'].index(column)
+        n = np.array([m[0][i] for m in hourly['moments']])
+        mean = np.array([m[1][i] for m in hourly['moments']])
+        m2 = np.array([m[2][i] for m in hourly['moments']])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(m2 / (n - 1))
+        return pd.DataFrame({'mean': np.where(n > 0, mean, np.nan), 'std': std, 'count': n},
+                            index=pd.Index(range(24), name='Hour'))
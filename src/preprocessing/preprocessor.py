@@ -9,4 +9,15 @@ def load_and_preview(filepath):
 def save_cleaned_data(df, country):
     output_path = f"../data/{country}_clean.csv"
     df.to_csv(output_path, index=False)
-    print(f"Cleaned data exported to: {output_path}")
\ No newline at end of file
+    print(f"Cleaned data exported to: {output_path}")
+
+def load_station_data(path):
+    # Same shape as the dashboard's load_all_data: Timestamp index, no Comments, hour column
+    df = pd.read_csv(path, parse_dates=['Timestamp'])
+    if 'Comments' in df.columns:
+        df = df.drop('Comments', axis=1)
+    df.set_index('Timestamp', inplace=True)
+    # Date-range filters slice the index by label, which needs it sorted
+    df.sort_index(inplace=True)
+    df['hour'] = df.index.hour
+    return df
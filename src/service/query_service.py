@@ -0,0 +1,264 @@
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from src.analysis import aggregations
+from src.analysis.cleaning_events import compute_cleaning_uplift, summarize_cleaning_uplift
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+JSON_TYPE = 'application/json'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+
+
+class QueryError(Exception):
+    """A bad request: unknown endpoint, country or metric, or malformed parameters."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryService:
+    """The dashboard's aggregations over one shared in-memory copy of the data.
+
+    ``dfs`` maps country to a DataFrame shaped like ``load_all_data`` returns.
+    With ``feeds`` (country -> ``StationFeed``), :meth:`refresh` ingests new rows
+    and bumps the dataset version, which invalidates cached responses; daily,
+    monthly and hourly queries are then answered from the feeds' incremental
+    aggregates.
+    Responses are cached serialized, keyed on endpoint, parameters, format and
+    dataset version.
+    """
+
+    def __init__(self, dfs, feeds=None, cache_size=512):
+        self.dfs = dict(dfs)
+        self.feeds = feeds or {}
+        self.version = 0
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.endpoints = {
+            'countries': self._countries,
+            'daily': self._daily,
+            'monthly': self._monthly,
+            'hourly': self._hourly,
+            'daytime': self._daytime,
+            'correlation': self._correlation,
+            'cleaning': self._cleaning,
+        }
+
+    def refresh(self):
+        """Poll live feeds; returns the number of rows ingested.
+
+        A feed that had no data yet is served from its first ingest on.
+        """
+        added = 0
+        dfs = dict(self.dfs)
+        for country, feed in self.feeds.items():
+            rows = feed.poll()
+            if rows:
+                added += rows
+                dfs[country] = feed.data
+        if added:
+            with self._lock:
+                # Swapped in whole so requests iterating the countries never see it change
+                self.dfs = dfs
+                self.version += 1
+                self._cache.clear()
+        return added
+
+    def handle(self, endpoint, params, fmt='json'):
+        """Return ``(content_type, body_bytes)`` for a query, from cache when possible."""
+        if endpoint not in self.endpoints:
+            raise QueryError(f"Unknown endpoint: {endpoint}", status=404)
+        if fmt not in ('json', 'arrow'):
+            raise QueryError(f"Unknown format: {fmt}")
+        if fmt == 'arrow' and pa is None:
+            raise QueryError("Arrow output requires pyarrow", status=406)
+
+        key = (self.version, endpoint, fmt, tuple(sorted(params.items())))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+
+        result = self.endpoints[endpoint](params)
+        response = _serialize(result, fmt)
+        with self._lock:
+            self.misses += 1
+            if key[0] == self.version:
+                self._cache[key] = response
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return response
+
+    def _frame(self, params):
+        country = params.get('country')
+        if country not in self.dfs:
+            raise QueryError(f"Unknown country: {country}. Available: {', '.join(self.dfs)}")
+        try:
+            return aggregations.filter_date_range(self.dfs[country], params.get('start'), params.get('end'))
+        except ValueError as e:
+            raise QueryError(f"Invalid date range: {e}")
+
+    def _metric(self, params, df, default='GHI'):
+        metric = params.get('metric', default)
+        if metric not in df.columns:
+            raise QueryError(f"Unknown metric: {metric}")
+        return metric
+
+    def _countries(self, params):
+        return pd.DataFrame([
+            {'country': country, 'rows': len(df), 'start': df.index.min(), 'end': df.index.max()}
+            for country, df in self.dfs.items()
+        ])
+
+    def _feed(self, params, metric):
+        # Live feeds keep these aggregates incrementally, so answer from them instead of rescanning
+        feed = self.feeds.get(params.get('country'))
+        return feed if feed is not None and metric in feed.aggregate_columns else None
+
+    def _daily(self, params):
+        df = self._frame(params)
+        metric = self._metric(params, df)
+        feed = self._feed(params, metric)
+        if feed is not None:
+            daily = feed.daily_means(params.get('start'), params.get('end'))[metric]
+        else:
+            daily = aggregations.daily_means(df, metric)
+        return daily.to_frame().reset_index()
+
+    def _monthly(self, params):
+        df = self._frame(params)
+        metric = self._metric(params, df)
+        feed = self._feed(params, metric)
+        if feed is not None:
+            monthly = feed.monthly_means(params.get('start'), params.get('end'))[metric]
+        else:
+            monthly = aggregations.monthly_means(df, metric)
+        return monthly.to_frame().reset_index()
+
+    def _hourly(self, params):
+        df = self._frame(params)
+        metric = self._metric(params, df)
+        feed = self._feed(params, metric)
+        # Hour-of-day moments cover the whole history, so a date range needs the rows
+        if feed is not None and 'start' not in params and 'end' not in params:
+            return feed.hourly_stats(metric)[['mean', 'std']].reset_index()
+        return aggregations.hourly_pattern(df, metric).reset_index()
+
+    def _daytime(self, params):
+        countries = params['countries'].split(',') if 'countries' in params else list(self.dfs)
+        dfs = {}
+        for country in countries:
+            dfs[country] = self._frame(dict(params, country=country))
+        metric = params.get('metric', 'GHI')
+        for df in dfs.values():
+            self._metric(params, df)
+        averages = aggregations.daytime_averages(dfs, metric)
+        return pd.DataFrame({'country': list(averages), f'average_{metric}': list(averages.values())})
+
+    def _correlation(self, params):
+        df = self._frame(params)
+        columns = params.get('columns', 'GHI,DNI,DHI,TModA,TModB').split(',')
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise QueryError(f"Unknown columns: {', '.join(missing)}")
+        return aggregations.correlation_matrix(df, columns).rename_axis('column').reset_index()
+
+    def _cleaning(self, params):
+        df = self._frame(params)
+        if 'Cleaning' not in df.columns:
+            raise QueryError("Cleaning flag not available in dataset")
+        normalize_by = params.get('normalize') or None
+        if normalize_by is not None and normalize_by not in df.columns:
+            raise QueryError(f"Unknown normalize column: {normalize_by}")
+        try:
+            events = compute_cleaning_uplift(df, window=params.get('window', '1h'), normalize_by=normalize_by)
+        except ValueError as e:
+            raise QueryError(str(e))
+        if params.get('detail') == 'events':
+            return events
+        return summarize_cleaning_uplift(events).reset_index()
+
+
+def _serialize(df, fmt):
+    if fmt == 'arrow':
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ARROW_TYPE, sink.getvalue().to_pybytes()
+    return JSON_TYPE, df.to_json(orient='records', date_format='iso').encode()
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """GET /<endpoint>?param=value&format=json|arrow"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        fmt = params.pop('format', 'json')
+        endpoint = url.path.strip('/')
+        service = self.server.service
+
+        if endpoint == 'health':
+            body = {'status': 'ok', 'version': service.version, 'countries': list(service.dfs),
+                    'cache_hits': service.hits, 'cache_misses': service.misses}
+            return self._send(200, JSON_TYPE, json.dumps(body).encode())
+        try:
+            content_type, body = service.handle(endpoint, params, fmt)
+        except QueryError as e:
+            return self._send(e.status, JSON_TYPE, json.dumps({'error': str(e)}).encode())
+        except Exception as e:
+            return self._send(500, JSON_TYPE, json.dumps({'error': f"{type(e).__name__}: {e}"}).encode())
+        self._send(200, content_type, body)
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The socketserver default backlog of 5 makes bursts of clients wait on SYN retries
+    request_queue_size = 128
+
+
+def make_server(service, host='127.0.0.1', port=8502, verbose=False):
+    """A threaded HTTP server (one thread per request) serving ``service``."""
+    server = QueryHTTPServer((host, port), QueryRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def start_refresh_thread(service, interval=5.0):
+    """Poll live feeds every ``interval`` seconds in a background thread."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            service.refresh()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return stop
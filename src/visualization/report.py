@@ -0,0 +1,138 @@
+import hashlib
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from src.visualization import visualization as viz
+
+# Bump when the set of figures or their layout changes so cached reports are rebuilt
+REPORT_VERSION = 2
+
+TIME_SERIES_COLUMNS = ['GHI', 'DNI', 'DHI', 'Tamb']
+SCATTER_PAIRS = [('WS', 'GHI'), ('WSgust', 'GHI'), ('WD', 'GHI'), ('TModA', 'GHI'), ('TModB', 'GHI')]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _init_worker():
+    # Workers only save figures, so draw headless without touching the importer's backend
+    plt.switch_backend('Agg')
+
+
+def _load(path):
+    df = pd.read_csv(path)
+    if 'Comments' in df.columns:
+        df = df.drop('Comments', axis=1)
+    return viz.prepare_time_series(df)
+
+
+def _figures(df):
+    # (name, callable returning a figure or a tuple of figures)
+    end = df.index.max()
+    start = max(df.index.min(), end - pd.Timedelta(days=7))
+    pairs = [(x, y) for x, y in SCATTER_PAIRS if x in df.columns and y in df.columns]
+    return [
+        ('time_series', lambda: viz.plot_time_series(df, TIME_SERIES_COLUMNS, show=False)),
+        ('period', lambda: viz.plot_period(df, TIME_SERIES_COLUMNS, str(start.date()), str(end.date()),
+                                           title_suffix="last 7 days", show=False)),
+        ('scatter_pairs', lambda: viz.plot_scatter_pairs(df, pairs, aggregate=True, show=False)),
+        ('histograms', lambda: viz.plot_histograms(df, show=False)),
+        ('wind_rose', lambda: viz.plot_wind_rose(df, show=False)),
+        ('rh_effect', lambda: viz.plot_rh_effect(df, aggregate=True, show=False)),
+        ('bubble_chart', lambda: viz.plot_bubble_chart(df, show=False)),
+    ]
+
+
+def render_country_report(country, path, output_dir, dpi=100, force=False):
+    """Render every EDA figure for one country to PNG, skipping work if the input is unchanged.
+
+    Returns a manifest dict with the input hash and the list of image files.
+    """
+    country_dir = os.path.join(output_dir, country.lower().replace(' ', '_'))
+    manifest_path = os.path.join(country_dir, 'manifest.json')
+    input_hash = file_hash(path)
+
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('input_hash') == input_hash and manifest.get('version') == REPORT_VERSION:
+            manifest['cached'] = True
+            return manifest
+
+    os.makedirs(country_dir, exist_ok=True)
+    df = _load(path)
+    images = []
+    for name, render in _figures(df):
+        figs = render()
+        figs = figs if isinstance(figs, tuple) else (figs,)
+        for i, fig in enumerate(figs):
+            filename = f"{name}.png" if len(figs) == 1 else f"{name}_{i + 1}.png"
+            fig.savefig(os.path.join(country_dir, filename), dpi=dpi)
+            plt.close(fig)
+            images.append(filename)
+        plt.close('all')
+
+    manifest = {
+        'country': country,
+        'input': os.path.abspath(path),
+        'input_hash': input_hash,
+        'version': REPORT_VERSION,
+        'directory': os.path.basename(country_dir),
+        'images': images,
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    manifest['cached'] = False
+    return manifest
+
+
+def write_index(manifests, output_dir):
+    """Write an index.html linking every country's figures."""
+    sections = []
+    for manifest in manifests:
+        images = '\n'.join(
+            f'<figure><img src="{manifest["directory"]}/{img}" loading="lazy">'
+            f'<figcaption>{html.escape(img)}</figcaption></figure>'
+            for img in manifest['images']
+        )
+        sections.append(f'<h2>{html.escape(manifest["country"])}</h2>\n{images}')
+    page = (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Solar EDA Report</title>'
+        '<style>body{font-family:Arial;margin:2em}img{max-width:100%}figure{margin:1em 0}</style>'
+        '</head><body>\n<h1>Solar EDA Report</h1>\n' + '\n'.join(sections) + '\n</body></html>\n'
+    )
+    index_path = os.path.join(output_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return index_path
+
+
+def generate_report(data_paths, output_dir='reports', processes=None, dpi=100, force=False):
+    """Render the EDA report for every country in ``data_paths`` in a process pool.
+
+    Each worker process switches to the Agg backend; the calling process keeps its own.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    countries = list(data_paths)
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        manifests = list(pool.map(
+            render_country_report,
+            countries,
+            [data_paths[c] for c in countries],
+            [output_dir] * len(countries),
+            [dpi] * len(countries),
+            [force] * len(countries),
+        ))
+    write_index(manifests, output_dir)
+    return manifests
@@ -1,16 +1,34 @@
-from turtle import color
 import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
-from windrose import WindroseAxes
+from src.analysis.cleaning_events import compute_cleaning_uplift
+from src.analysis.wind_rose import wind_rose_table, to_frequency
+
+# Above this many rows, aggregate=True draws hexbin densities instead of raw points
+AGGREGATE_THRESHOLD = 50_000
 
 def prepare_time_series(df):
     df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%Y-%m-%d %H:%M')
     df.set_index('Timestamp', inplace=True)
     return df
 
-def plot_time_series(df, columns):
+def _finish(fig, show):
+    plt.tight_layout()
+    if show:
+        plt.show()
+    return fig
+
+def _scatter(df, x, y, ax, aggregate=False, **kwargs):
+    data = df[[x, y]].dropna()
+    if aggregate and len(data) > AGGREGATE_THRESHOLD:
+        ax.hexbin(data[x], data[y], gridsize=80, bins='log', cmap='viridis', mincnt=1)
+        ax.set_xlabel(x)
+        ax.set_ylabel(y)
+    else:
+        sns.scatterplot(data=data, x=x, y=y, ax=ax, rasterized=True, **kwargs)
+
+def plot_time_series(df, columns, show=True):
     sampled_df = df.resample('D').mean().ffill()
     colors = ['tab:blue', 'tab:orange', 'tab:green', 'tab:red']
     fig, axs = plt.subplots(2, 2, figsize=(16, 10))
@@ -22,10 +40,9 @@ def plot_time_series(df, columns):
         axs[i].set_ylabel(col)
         axs[i].grid(True)
         axs[i].legend()
-    plt.tight_layout()
-    plt.show()
+    return _finish(fig, show)
 
-def plot_period(df, columns, start_date, end_date, title_suffix=""):
+def plot_period(df, columns, start_date, end_date, title_suffix="", show=True):
     period_df = df.loc[start_date:end_date]
     colors = ['tab:blue', 'tab:orange', 'tab:green', 'tab:red']
     fig, axs = plt.subplots(4, 1, figsize=(16, 20))
@@ -37,80 +54,113 @@ def plot_period(df, columns, start_date, end_date, title_suffix=""):
         axs[i].set_ylabel(col)
         axs[i].grid(True)
         axs[i].legend()
-    plt.tight_layout()
-    plt.show()
+    return _finish(fig, show)
 
-def plot_cleaning_effect(df):
+def plot_cleaning_effect(df, show=True):
     mod_means = df.groupby('Cleaning')[['ModA', 'ModB']].mean()
-    mod_means.plot(kind='bar', figsize=(8, 6), color=['#1f77b4', '#ff7f0e'])
+    ax = mod_means.plot(kind='bar', figsize=(8, 6), color=['#1f77b4', '#ff7f0e'])
     plt.title('Average ModA and ModB by Cleaning Status')
     plt.xlabel('Cleaning (0 = Before, 1 = After)')
     plt.ylabel('Average Irradiance (W/m²)')
     plt.xticks(ticks=[0, 1], labels=['Before Cleaning', 'After Cleaning'], rotation=0)
     plt.grid(axis='y')
     plt.legend(title='Sensor')
-    plt.tight_layout()
-    plt.show()
+    return _finish(ax.figure, show)
+
+def plot_cleaning_events(df, sensors=('ModA', 'ModB'), window='1h', normalize_by=None, show=True):
+    events = compute_cleaning_uplift(df, sensors, window=window, normalize_by=normalize_by)
+    events = events[events['valid']]
+    fig, ax = plt.subplots(figsize=(12, 5))
+    for sensor in sensors:
+        ax.plot(events['event_start'], events[f'{sensor}_uplift_pct'], marker='o', label=sensor)
+    ax.axhline(0, color='grey', linewidth=1)
+    ax.set_title(f'Per-Event Cleaning Uplift ({window} windows)')
+    ax.set_xlabel('Cleaning Event')
+    ax.set_ylabel('Uplift (%)')
+    ax.grid(True)
+    ax.legend(title='Sensor')
+    _finish(fig, show)
+    return events
 
-def plot_correlation_heatmap(df, columns):
+def plot_correlation_heatmap(df, columns, show=True):
     corr_matrix = df[columns].corr()
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
     sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
     plt.title('Correlation Heatmap')
-    plt.tight_layout()
-    plt.show()
+    return _finish(fig, show)
 
-def plot_scatter_pairs(df, pairs):
+def plot_scatter_pairs(df, pairs, aggregate=False, show=True):
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
     axes = axes.flatten()
     for i, (x, y) in enumerate(pairs):
-        sns.scatterplot(data=df, x=x, y=y, ax=axes[i], alpha=0.6)
+        _scatter(df, x, y, axes[i], aggregate, alpha=0.6)
         axes[i].set_title(f'{y} vs. {x}')
     if len(pairs) < 6:
         fig.delaxes(axes[-1])
-    plt.tight_layout()
-    plt.show()
+    return _finish(fig, show)
 
-def plot_histograms(df):
+def plot_histograms(df, show=True):
     fig, axes = plt.subplots(1, 2, figsize=(12, 5))
     curated_ghi = df['GHI'].replace(0, np.nan).dropna()
     sns.histplot(curated_ghi, bins=40, kde=True, ax=axes[0], color='orange')
     axes[0].set_title("Histogram of GHI")
     sns.histplot(df['WS'], bins=40, kde=True, ax=axes[1], color='blue')
     axes[1].set_title("Histogram of Wind Speed")
-    plt.tight_layout()
-    plt.show()
+    return _finish(fig, show)
+
+def plot_wind_rose(df, table=None, show=True):
+    # Pre-binned sector x speed table; pass ``table`` to reuse one computed elsewhere
+    freq = to_frequency(wind_rose_table(df) if table is None else table)
+    sectors = len(freq.index)
+    width = 2 * np.pi / sectors
+    theta = np.arange(sectors) * width
+    colors = plt.cm.viridis(np.linspace(0, 1, len(freq.columns)))
 
-def plot_wind_rose(df):
-    ax = WindroseAxes.from_ax()
-    ax.bar(df["WD"], df["WS"], normed=True, opening=0.8, edgecolor='white')
-    ax.set_legend(title="Wind Speed (m/s)")
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_subplot(projection='polar')
+    ax.set_theta_zero_location('N')
+    ax.set_theta_direction(-1)
+    bottom = np.zeros(sectors)
+    for color, speed in zip(colors, freq.columns):
+        values = freq[speed].to_numpy()
+        ax.bar(theta, values, width=width * 0.8, bottom=bottom, color=color, edgecolor='white', label=speed)
+        bottom += values
+    ax.set_xticks(theta)
+    ax.set_xticklabels(freq.index)
+    ax.legend(title="Wind Speed (m/s)", loc='upper left', bbox_to_anchor=(1.05, 1))
     plt.title("Wind Rose")
-    plt.show()
+    return _finish(fig, show)
 
-def plot_rh_effect(df):
+def plot_rh_effect(df, aggregate=False, show=True):
     fig, axs = plt.subplots(1, 2, figsize=(12, 5))
-    sns.scatterplot(x='RH', y='Tamb', data=df, ax=axs[0])
-    sns.scatterplot(x='RH', y='GHI', data=df, ax=axs[1])
+    _scatter(df, 'RH', 'Tamb', axs[0], aggregate)
+    _scatter(df, 'RH', 'GHI', axs[1], aggregate)
     axs[0].set_title('RH vs. Tamb')
     axs[1].set_title('RH vs. GHI')
-    plt.tight_layout()
-    plt.show()
+    _finish(fig, show)
 
-    fig, axs = plt.subplots(1, 2, figsize=(12, 5))
-    sns.regplot(x='RH', y='Tamb', data=df, ax=axs[0], scatter_kws={'alpha':0.5}, line_kws={'color':'red'})
-    sns.regplot(x='RH', y='GHI', data=df, ax=axs[1], scatter_kws={'alpha':0.5}, line_kws={'color':'red'})
+    trend_fig, axs = plt.subplots(1, 2, figsize=(12, 5))
+    for ax, y in zip(axs, ['Tamb', 'GHI']):
+        data = df[['RH', y]].dropna()
+        if aggregate and len(data) > AGGREGATE_THRESHOLD:
+            _scatter(data, 'RH', y, ax, aggregate)
+            slope, intercept = np.polyfit(data['RH'], data[y], 1)
+            line_x = np.array([data['RH'].min(), data['RH'].max()])
+            ax.plot(line_x, slope * line_x + intercept, color='red')
+        else:
+            sns.regplot(x='RH', y=y, data=data, ax=ax, scatter_kws={'alpha':0.5, 'rasterized':True}, line_kws={'color':'red'})
     axs[0].set_title('RH vs. Tamb with Trendline')
     axs[1].set_title('RH vs. GHI with Trendline')
-    plt.tight_layout()
-    plt.show()
+    return fig, _finish(trend_fig, show)
 
-def plot_bubble_chart(df, size='RH'):
-    plt.figure(figsize=(8,6))
+def plot_bubble_chart(df, size='RH', show=True):
+    fig = plt.figure(figsize=(8,6))
     sizes = df[size] / df[size].max() * 30
-    plt.scatter(df["GHI"], df["Tamb"], s=sizes, alpha=0.5, c='blue', edgecolors='w', linewidth=0.5)
+    plt.scatter(df["GHI"], df["Tamb"], s=sizes, alpha=0.5, c='blue', edgecolors='w', linewidth=0.5, rasterized=True)
     plt.xlabel("GHI")
     plt.ylabel("Tamb")
     plt.title(f'Bubble Chart: {"Tamb"} vs. {"GHI"} with bubble size = {size}')
     plt.grid(True)
-    plt.show()
\ No newline at end of file
+    if show:
+        plt.show()
+    return fig